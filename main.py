@@ -1,16 +1,20 @@
-import json
+import asyncio
+import functools
+import os
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from urllib.parse import parse_qs, urlencode, urljoin, urlparse
 
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
+import httpx
+import lxml.html
+import orjson
+from lxml import etree
 
-COL_TITLE = "\u041d\u0430\u0437\u0432\u0430\u043d\u0438\u0435"
-COL_PRICE = "\u0421\u0442\u043e\u0438\u043c\u043e\u0441\u0442\u044c"
-COL_LINK = "\u0421\u0441\u044b\u043b\u043a\u0430"
-COL_ROOMS = "\u041a\u043e\u043b-\u0432\u043e \u043a\u043e\u043c\u043d\u0430\u0442"
+KRISHA_ORIGIN = "https://krisha.kz"
 
 MAP_URL = (
     "https://krisha.kz/map/prodazha/kvartiry/shymkent/?das[price][to]=17000000&zoom=14&lat=42.31622&lon=69.57153"
@@ -28,42 +32,73 @@ HEADERS = {
         "Chrome/124.0.0.0 Safari/537.36"
     ),
     "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
 }
 
 MAX_PRICE = 16_000_000
 TARGET_ROOMS = 2
-SEEN_IDS_FILE = Path("seen_ids.json")
+SEEN_IDS_FILE = Path("seen_ids.txt")
+SEEN_IDS_SORT_LIMIT = 10_000
 TELEGRAM_BOT_TOKEN = ""
 TELEGRAM_CHAT_ID = "-5128105376"
 
 REQUEST_TIMEOUT = 30
 REQUEST_RETRIES = 3
 RETRY_BACKOFF_SEC = 2
-REQUEST_DELAY_SEC = 0.7
-MAX_CONSECUTIVE_FAILURES = 5
+REQUEST_CONCURRENCY = 6
+LISTING_PAGE_SIZE = 20
 MAX_PAGES = None
 
+_WS_RE = re.compile(r"\s+")
+_ROOMS_RE = re.compile(r"^\s*(\d+)\s*-")
+_AD_ID_RE = re.compile(r"/a/show/(\d+)")
+_PAGE_NUM_RE = re.compile(r'(?:data-nav-last-page="|data-page="|[?&](?:amp;)?page=)(\d+)')
+_NON_DIGIT_BYTES = bytes(b for b in range(256) if not 48 <= b <= 57)
+_CARDS_XPATH = etree.XPath("//div[contains(concat(' ', normalize-space(@class), ' '), ' a-card ')]")
+_CARD_TITLE_XPATH = etree.XPath(".//a[contains(concat(' ', normalize-space(@class), ' '), ' a-card__title ')][@href]")
+_CARD_STATS_XPATH = etree.XPath(
+    ".//*[contains(@class, 'a-card__title-stats') or contains(@class, 'a-card__header-stats')]"
+)
+_CARD_PRICE_XPATH = etree.XPath(
+    ".//*[contains(concat(' ', normalize-space(@class), ' '), ' a-card__price ') or contains(concat(' ', normalize-space(@class), ' '), ' a-card__price-text ')]"
+)
+
+_TG_CLIENT = httpx.Client(http2=True, timeout=REQUEST_TIMEOUT)
+_TG_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass(slots=True)
+class Ad:
+    title: str
+    price_text: str
+    link: str
+    rooms: int
+    ad_id: str | None = None
+    price_int: int | None = None
+
 
 def clean_text(value: str) -> str:
-    return re.sub(r"\s+", " ", value.replace("\xa0", " ")).strip()
+    return _WS_RE.sub(" ", value.replace("\xa0", " ")).strip()
 
 
 def extract_rooms(text: str):
     text = (text or "").lower()
-    m = re.search(r"^\s*(\d+)\s*-", text)
+    m = _ROOMS_RE.search(text)
     return int(m.group(1)) if m else None
 
 
 def extract_ad_id(link: str):
-    m = re.search(r"/a/show/(\d+)", link)
+    m = _AD_ID_RE.search(link)
     return m.group(1) if m else None
 
 
 def parse_price_to_int(price_text: str):
-    digits = re.sub(r"\D", "", price_text or "")
+    digits = (price_text or "").encode("ascii", "ignore").translate(None, _NON_DIGIT_BYTES)
     return int(digits) if digits else None
 
 
+@functools.lru_cache(maxsize=1)
 def build_list_url_from_map(map_url: str) -> str:
     parsed = urlparse(map_url)
     qs = parse_qs(parsed.query)
@@ -77,7 +112,16 @@ def build_list_url_from_map(map_url: str) -> str:
         if key.startswith("das[") and values:
             list_params[key] = values[0]
 
-    return f"https://krisha.kz/prodazha/kvartiry/shymkent/?{urlencode(list_params)}"
+    return f"{KRISHA_ORIGIN}/prodazha/kvartiry/shymkent/?{urlencode(list_params)}"
+
+
+def extract_last_page(html: str) -> int | None:
+    start = html.find('class="paginator')
+    if start == -1:
+        return None
+    end = html.find("</nav>", start)
+    section = html[start:end] if end != -1 else html[start:]
+    return max((int(n) for n in _PAGE_NUM_RE.findall(section)), default=1)
 
 
 def build_page_url(base_list_url: str, page: int) -> str:
@@ -87,130 +131,177 @@ def build_page_url(base_list_url: str, page: int) -> str:
     return f"{base_list_url}{sep}page={page}"
 
 
-def parse_page(html: str):
-    soup = BeautifulSoup(html, "html.parser")
+def parse_page(
+    html: str,
+    filter_here: bool = False,
+    target_rooms: int = TARGET_ROOMS,
+    max_price: int = MAX_PRICE,
+):
     items = []
-    seen_links = set()
+    try:
+        tree = lxml.html.fromstring(html)
+    except etree.ParserError:
+        return items
 
-    for a in soup.select('a.a-card__title[href*="/a/show/"]'):
-        href = (a.get("href") or "").strip()
-        if not href:
-            continue
+    seen_ad_ids = set()
 
-        link = urljoin("https://krisha.kz", href)
-        if link in seen_links:
+    for card in _CARDS_XPATH(tree):
+        anchors = _CARD_TITLE_XPATH(card)
+        if not anchors:
             continue
 
-        title = clean_text(a.get("title") or a.get_text(" ", strip=True))
-        if not title:
+        a = anchors[0]
+        href = a.get("href").strip()
+        ad_id = extract_ad_id(href)
+        if not ad_id or ad_id in seen_ad_ids:
             continue
 
-        card = a.find_parent(lambda tag: tag.name == "div" and "a-card" in (tag.get("class") or []))
-        if not card:
+        title = clean_text(a.get("title") or " ".join(a.itertext()))
+        if not title:
             continue
 
-        price_el = card.select_one(".a-card__price, .a-card__price-text")
-        price_text = clean_text(price_el.get_text(" ", strip=True)) if price_el else ""
-
         rooms = extract_rooms(title)
         if rooms is None:
-            rooms = extract_rooms(clean_text(card.get_text(" ", strip=True)))
+            stats_els = _CARD_STATS_XPATH(card)
+            if stats_els:
+                rooms = extract_rooms(clean_text(" ".join(stats_els[0].itertext())))
+        if rooms is None:
+            continue
+        if filter_here and rooms != target_rooms:
+            continue
 
-        if not price_text or rooms is None:
+        price_els = _CARD_PRICE_XPATH(card)
+        price_text = clean_text(" ".join(price_els[0].itertext())) if price_els else ""
+        if not price_text:
             continue
+        price_int = None
+        if filter_here:
+            price_int = parse_price_to_int(price_text)
+            if price_int is None or price_int > max_price:
+                continue
+
+        if href.startswith("http"):
+            link = href
+        elif href[:1] == "/":
+            link = KRISHA_ORIGIN + href
+        else:
+            link = urljoin(KRISHA_ORIGIN, href)
 
         items.append(
-            {
-                COL_TITLE: title,
-                COL_PRICE: price_text,
-                COL_LINK: link,
-                COL_ROOMS: rooms,
-            }
+            Ad(title=title, price_text=price_text, link=link, rooms=rooms, ad_id=ad_id, price_int=price_int)
         )
-        seen_links.add(link)
+        seen_ad_ids.add(ad_id)
 
     return items
 
 
-def get_with_retries(session: requests.Session, url: str):
+async def fetch_page(session: aiohttp.ClientSession, url: str) -> str:
     last_exc = None
     for attempt in range(1, REQUEST_RETRIES + 1):
         try:
-            resp = session.get(url, timeout=REQUEST_TIMEOUT)
-            resp.raise_for_status()
-            return resp
-        except requests.RequestException as exc:
+            async with session.get(url) as resp:
+                resp.raise_for_status()
+                return await resp.text(errors="replace")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
             last_exc = exc
             print(f"Request failed (attempt {attempt}/{REQUEST_RETRIES}): {url}")
             if attempt < REQUEST_RETRIES:
-                time.sleep(RETRY_BACKOFF_SEC * attempt)
+                await asyncio.sleep(RETRY_BACKOFF_SEC * attempt)
     raise last_exc
 
 
-def scrape_all(max_pages: int | None = None):
+async def scrape_all_async(max_pages: int | None = None):
     list_url = build_list_url_from_map(MAP_URL)
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(REQUEST_CONCURRENCY)
 
-    session = requests.Session()
-    session.headers.update(HEADERS)
-
-    all_items = []
-    page = 1
-    consecutive_failures = 0
-
-    while True:
-        if max_pages is not None and page > max_pages:
-            break
-
-        page_url = build_page_url(list_url, page)
-        print(f"\u041f\u0430\u0440\u0441\u0438\u043d\u0433: {page_url}")
-
-        try:
-            response = get_with_retries(session, page_url)
-            consecutive_failures = 0
-        except requests.RequestException as exc:
-            consecutive_failures += 1
-            print(f"\u041f\u0440\u043e\u043f\u0443\u0441\u043a \u0441\u0442\u0440\u0430\u043d\u0438\u0446\u044b \u0438\u0437-\u0437\u0430 \u043e\u0448\u0438\u0431\u043a\u0438 \u0441\u0435\u0442\u0438: {page_url}. \u041e\u0448\u0438\u0431\u043a\u0430: {exc}")
-            if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
-                print("\u0421\u043b\u0438\u0448\u043a\u043e\u043c \u043c\u043d\u043e\u0433\u043e \u043f\u043e\u0434\u0440\u044f\u0434 \u0441\u0435\u0442\u0435\u0432\u044b\u0445 \u043e\u0448\u0438\u0431\u043e\u043a. \u041e\u0441\u0442\u0430\u043d\u0430\u0432\u043b\u0438\u0432\u0430\u0435\u043c \u043f\u0430\u0433\u0438\u043d\u0430\u0446\u0438\u044e.")
-                break
-            page += 1
+    connector = aiohttp.TCPConnector(
+        limit=REQUEST_CONCURRENCY,
+        limit_per_host=REQUEST_CONCURRENCY,
+        keepalive_timeout=30,
+    )
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+
+    rows = []
+    seen_page_ids: set[str] = set()
+    seen_ad_ids: set[str] = set()
+
+    async with aiohttp.ClientSession(connector=connector, headers=HEADERS, timeout=timeout) as session:
+        print(f"\u041f\u0430\u0440\u0441\u0438\u043d\u0433: {list_url}")
+        first_html = await fetch_page(session, list_url)
+
+        last_page = extract_last_page(first_html)
+        if last_page is None:
+            last_page = 1
+            first_page_ads = len(set(_AD_ID_RE.findall(first_html)))
+            if first_page_ads >= LISTING_PAGE_SIZE:
+                print(
+                    f"\u0412\u043d\u0438\u043c\u0430\u043d\u0438\u0435: \u043d\u0430 \u043f\u0435\u0440\u0432\u043e\u0439 \u0441\u0442\u0440\u0430\u043d\u0438\u0446\u0435 {first_page_ads} \u043e\u0431\u044a\u044f\u0432\u043b\u0435\u043d\u0438\u0439, \u043d\u043e \u043f\u0430\u0433\u0438\u043d\u0430\u0442\u043e\u0440 \u043d\u0435 \u043d\u0430\u0439\u0434\u0435\u043d. "
+                    "\u0412\u043e\u0437\u043c\u043e\u0436\u043d\u043e, \u0438\u0437\u043c\u0435\u043d\u0438\u043b\u0430\u0441\u044c \u0440\u0430\u0437\u043c\u0435\u0442\u043a\u0430 \u0441\u0430\u0439\u0442\u0430; \u0431\u0443\u0434\u0435\u0442 \u043e\u0431\u0440\u0430\u0431\u043e\u0442\u0430\u043d\u0430 \u0442\u043e\u043b\u044c\u043a\u043e \u043f\u0435\u0440\u0432\u0430\u044f \u0441\u0442\u0440\u0430\u043d\u0438\u0446\u0430."
+                )
+        print(f"\u0421\u0442\u0440\u0430\u043d\u0438\u0446: {last_page}")
+        if max_pages is not None:
+            last_page = min(last_page, max_pages)
+
+        with ThreadPoolExecutor(max_workers=REQUEST_CONCURRENCY) as executor:
+
+            async def parse_html(html: str):
+                page_ids = set(_AD_ID_RE.findall(html))
+                items = await loop.run_in_executor(executor, parse_page, html, True)
+                return page_ids, items
+
+            async def fetch_and_parse(page_url: str):
+                async with semaphore:
+                    print(f"\u041f\u0430\u0440\u0441\u0438\u043d\u0433: {page_url}")
+                    html = await fetch_page(session, page_url)
+                return await parse_html(html)
+
+            page_urls = [build_page_url(list_url, p) for p in range(2, last_page + 1)]
+            results = await asyncio.gather(
+                parse_html(first_html),
+                *(fetch_and_parse(url) for url in page_urls),
+                return_exceptions=True,
+            )
+
+    for page_url, result in zip([list_url, *page_urls], results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, (aiohttp.ClientError, asyncio.TimeoutError)):
+                raise result
+            print(f"\u041f\u0440\u043e\u043f\u0443\u0441\u043a \u0441\u0442\u0440\u0430\u043d\u0438\u0446\u044b \u0438\u0437-\u0437\u0430 \u043e\u0448\u0438\u0431\u043a\u0438 \u0441\u0435\u0442\u0438: {page_url}. \u041e\u0448\u0438\u0431\u043a\u0430: {result}")
             continue
 
-        page_items = parse_page(response.text)
-        print(f"\u041d\u0430\u0439\u0434\u0435\u043d\u043e \u043e\u0431\u044a\u044f\u0432\u043b\u0435\u043d\u0438\u0439 \u043d\u0430 \u0441\u0442\u0440\u0430\u043d\u0438\u0446\u0435: {len(page_items)}")
-        if not page_items:
-            print("\u041f\u0443\u0441\u0442\u0430\u044f \u0441\u0442\u0440\u0430\u043d\u0438\u0446\u0430, \u043e\u0441\u0442\u0430\u043d\u043e\u0432\u043a\u0430 \u043f\u0430\u0433\u0438\u043d\u0430\u0446\u0438\u0438.")
-            break
+        page_ids, items = result
+        print(f"ID \u043e\u0431\u044a\u044f\u0432\u043b\u0435\u043d\u0438\u0439 \u0432 HTML \u0441\u0442\u0440\u0430\u043d\u0438\u0446\u044b: {len(page_ids)}, \u043f\u043e\u0434\u0445\u043e\u0434\u0438\u0442 \u043f\u043e\u0434 \u0444\u0438\u043b\u044c\u0442\u0440: {len(items)}")
 
-        all_items.extend(page_items)
-        page += 1
-        time.sleep(REQUEST_DELAY_SEC)
+        seen_page_ids.update(page_ids)
+        for item in items:
+            if item.ad_id in seen_ad_ids:
+                continue
+            seen_ad_ids.add(item.ad_id)
+            rows.append(item)
 
-    rows = list({row[COL_LINK]: row for row in all_items}.values())
-    if not rows:
+    if not seen_page_ids:
         raise RuntimeError("\u041d\u0435 \u0443\u0434\u0430\u043b\u043e\u0441\u044c \u0438\u0437\u0432\u043b\u0435\u0447\u044c \u043e\u0431\u044a\u044f\u0432\u043b\u0435\u043d\u0438\u044f \u0432 \u0432\u044b\u0431\u0440\u0430\u043d\u043d\u043e\u0439 \u043e\u0431\u043b\u0430\u0441\u0442\u0438.")
 
     return rows
 
 
-def filter_target(rows: list[dict]):
+def filter_target(rows: list[Ad]):
     filtered = []
     for row in rows:
-        if row.get(COL_ROOMS) != TARGET_ROOMS:
-            continue
+        if row.price_int is None:
+            if row.rooms != TARGET_ROOMS:
+                continue
 
-        price_int = parse_price_to_int(row.get(COL_PRICE, ""))
-        if price_int is None or price_int > MAX_PRICE:
-            continue
+            price_int = parse_price_to_int(row.price_text)
+            if price_int is None or price_int > MAX_PRICE:
+                continue
+            row.price_int = price_int
 
-        ad_id = extract_ad_id(row.get(COL_LINK, ""))
-        if not ad_id:
+        if not row.ad_id:
             continue
 
-        row_copy = dict(row)
-        row_copy["ad_id"] = ad_id
-        row_copy["price_int"] = price_int
-        filtered.append(row_copy)
+        filtered.append(row)
 
     return filtered
 
@@ -219,49 +310,88 @@ def load_seen_ids(path: Path):
     if not path.exists():
         return set()
 
-    try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return set()
-
-    return {str(x) for x in data} if isinstance(data, list) else set()
+    return set(path.read_text(encoding="ascii").split())
 
 
 def save_seen_ids(path: Path, ids: set[str]):
-    path.write_text(json.dumps(sorted(ids), ensure_ascii=False, indent=2), encoding="utf-8")
+    ordered = sorted(ids) if len(ids) < SEEN_IDS_SORT_LIMIT else ids
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text("\n".join(ordered) + "\n", encoding="ascii")
+    os.replace(tmp_path, path)
+
+
+def append_seen_ids(path: Path, new_ids: list[str]):
+    with path.open("a", encoding="ascii") as fh:
+        fh.write("\n".join(new_ids) + "\n")
 
 
-def split_messages(lines: list[str], limit: int = 3500):
+def compact_seen_ids(path: Path, ids: set[str]):
+    if not path.exists():
+        return
+
+    compact_size = sum(len(x) + 1 for x in ids)
+    if path.stat().st_size > 2 * compact_size:
+        save_seen_ids(path, ids)
+
+
+def split_messages(lines: list[str], limit: int = 4000):
     chunks = []
-    current = ""
+    current_parts: list[str] = []
+    current_len = 0
     for line in lines:
         block = line + "\n\n"
-        if len(current) + len(block) > limit and current:
-            chunks.append(current.rstrip())
-            current = block
-        else:
-            current += block
-    if current:
-        chunks.append(current.rstrip())
+        if current_len + len(block) > limit and current_parts:
+            chunks.append("".join(current_parts).rstrip())
+            current_parts = []
+            current_len = 0
+        current_parts.append(block)
+        current_len += len(block)
+    if current_parts:
+        chunks.append("".join(current_parts).rstrip())
     return chunks
 
 
+def telegram_retry_delay(resp: httpx.Response, attempt: int) -> float:
+    if resp.status_code == 429:
+        try:
+            payload = orjson.loads(resp.content)
+        except orjson.JSONDecodeError:
+            payload = None
+        if isinstance(payload, dict):
+            retry_after = (payload.get("parameters") or {}).get("retry_after")
+            if isinstance(retry_after, (int, float)):
+                return float(retry_after)
+    return RETRY_BACKOFF_SEC * attempt
+
+
 def send_telegram_message(token: str, chat_id: str, text: str):
     url = f"https://api.telegram.org/bot{token}/sendMessage"
-    resp = requests.post(url, data={"chat_id": chat_id, "text": text}, timeout=30)
+    for attempt in range(1, REQUEST_RETRIES + 1):
+        try:
+            resp = _TG_CLIENT.post(url, data={"chat_id": chat_id, "text": text})
+        except httpx.TransportError as exc:
+            if attempt == REQUEST_RETRIES:
+                raise
+            print(f"Telegram request failed (attempt {attempt}/{REQUEST_RETRIES}): {exc!r}")
+            time.sleep(RETRY_BACKOFF_SEC * attempt)
+            continue
+        if resp.status_code not in _TG_RETRY_STATUSES or attempt == REQUEST_RETRIES:
+            break
+        print(f"Telegram request failed (attempt {attempt}/{REQUEST_RETRIES}): HTTP {resp.status_code}")
+        time.sleep(telegram_retry_delay(resp, attempt))
     resp.raise_for_status()
-    payload = resp.json()
+    payload = orjson.loads(resp.content)
     if not payload.get("ok"):
         raise RuntimeError(f"Telegram API error: {payload}")
 
 
-def notify_new_ads(new_rows: list[dict], token: str, chat_id: str):
+def notify_new_ads(new_rows: list[Ad], token: str, chat_id: str):
     if not new_rows:
         send_telegram_message(token, chat_id, "\u041d\u043e\u0432\u044b\u0445 \u043e\u0431\u044a\u044f\u0432\u043b\u0435\u043d\u0438\u0439 \u043d\u0435\u0442. \u041d\u0438\u0447\u0435\u0433\u043e \u0441\u0442\u0440\u0430\u0448\u043d\u043e\u0433\u043e, \u0436\u0434\u0438\u0442\u0435 \u0437\u0430\u0432\u0442\u0440\u0430.")
         print("\u041d\u043e\u0432\u044b\u0445 \u043e\u0431\u044a\u044f\u0432\u043b\u0435\u043d\u0438\u0439 \u043f\u043e\u0434 \u0444\u0438\u043b\u044c\u0442\u0440 \u043d\u0435\u0442.")
         return
 
-    new_rows.sort(key=lambda r: r["price_int"])
+    new_rows.sort(key=lambda r: r.price_int)
     header = (
         "\u041d\u043e\u0432\u044b\u0435 \u043e\u0431\u044a\u044f\u0432\u043b\u0435\u043d\u0438\u044f Krisha\n"
         f"\u0424\u0438\u043b\u044c\u0442\u0440: {TARGET_ROOMS} \u043a\u043e\u043c\u043d\u0430\u0442\u044b, \u0446\u0435\u043d\u0430 <= {MAX_PRICE:,} \u0442\u0433".replace(",", " ")
@@ -272,9 +402,9 @@ def notify_new_ads(new_rows: list[dict], token: str, chat_id: str):
     lines = []
     for idx, row in enumerate(new_rows, start=1):
         lines.append(
-            f"{idx}) {row[COL_TITLE]}\n"
-            f"\u0426\u0435\u043d\u0430: {row[COL_PRICE]}\n"
-            f"\u0421\u0441\u044b\u043b\u043a\u0430: {row[COL_LINK]}"
+            f"{idx}) {row.title}\n"
+            f"\u0426\u0435\u043d\u0430: {row.price_text}\n"
+            f"\u0421\u0441\u044b\u043b\u043a\u0430: {row.link}"
         )
 
     for chunk in split_messages(lines):
@@ -290,25 +420,23 @@ def run(max_pages: int | None = None):
             "\u0417\u0430\u043f\u043e\u043b\u043d\u0438 \u0438\u0445 \u0432 \u043a\u043e\u0434\u0435 \u0438\u043b\u0438 \u043f\u0435\u0440\u0435\u0434\u0430\u0439 \u0447\u0435\u0440\u0435\u0437 \u043f\u0435\u0440\u0435\u043c\u0435\u043d\u043d\u044b\u0435 \u043e\u043a\u0440\u0443\u0436\u0435\u043d\u0438\u044f."
         )
 
-    rows = scrape_all(max_pages=max_pages)
-    filtered = filter_target(rows)
-
     seen_ids = load_seen_ids(SEEN_IDS_FILE)
-    new_rows = [row for row in filtered if row["ad_id"] not in seen_ids]
+    compact_seen_ids(SEEN_IDS_FILE, seen_ids)
+
+    rows = asyncio.run(scrape_all_async(max_pages=max_pages))
+    filtered = filter_target(rows)
+    new_rows = [row for row in filtered if row.ad_id not in seen_ids]
 
     notify_new_ads(new_rows, token=token, chat_id=chat_id)
 
     if new_rows:
-        seen_ids.update(row["ad_id"] for row in new_rows)
-        save_seen_ids(SEEN_IDS_FILE, seen_ids)
+        append_seen_ids(SEEN_IDS_FILE, [row.ad_id for row in new_rows])
         print(f"\u0421\u043e\u0445\u0440\u0430\u043d\u0435\u043d\u043e \u043d\u043e\u0432\u044b\u0445 ID: {len(new_rows)}")
     else:
         print("\u0421\u043e\u0441\u0442\u043e\u044f\u043d\u0438\u0435 \u0431\u0435\u0437 \u0438\u0437\u043c\u0435\u043d\u0435\u043d\u0438\u0439.")
 
 
 def load_env_overrides():
-    import os
-
     global TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, MAX_PAGES
 
     TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", TELEGRAM_BOT_TOKEN)